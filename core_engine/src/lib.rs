@@ -22,6 +22,8 @@ pub mod session;
 pub mod storage;
 pub mod transform_history;
 
+/// Re-export of the `arrow` crate backing DuckDB, so downstream crates share its exact version.
+pub use duckdb::arrow;
 pub use error::{Result, RustoraError};
 pub use filter::{FilterCondition, FilterLogic, FilterOperator, FilterSpec};
 pub use session::RustoraSession;
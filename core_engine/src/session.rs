@@ -1,7 +1,8 @@
 use crate::error::{Result, RustoraError};
 use crate::filter::FilterSpec;
-use crate::storage::{CsvImportOptions, DuckStorage};
+use crate::storage::{self, CsvImportOptions, DuckStorage};
 use crate::transform_history::{StepEntry, TransformHistory, TransformStep};
+use duckdb::arrow::record_batch::RecordBatch;
 use polars::prelude::*;
 use std::collections::HashMap;
 use std::io::Cursor;
@@ -82,6 +83,14 @@ impl RustoraSession {
         Ok(())
     }
 
+    /// Close the current project, dropping the DuckDB connection (and its file lock)
+    /// immediately. Transient datasets and transform histories are discarded.
+    pub fn close_project(&mut self) {
+        self.storage = None;
+        self.transient.clear();
+        self.histories.clear();
+    }
+
     /// Get the current project path.
     pub fn project_path(&self) -> Option<&str> {
         self.storage.as_ref().map(|s| s.db_path())
@@ -175,6 +184,27 @@ impl RustoraSession {
         Ok(name)
     }
 
+    /// Import in-memory file contents (e.g. bytes already read by the caller) into the
+    /// DuckDB database as a persistent table. See [`DuckStorage::import_bytes`] for formats.
+    pub fn import_bytes(
+        &mut self,
+        data: &[u8],
+        format: &str,
+        table_name: Option<&str>,
+    ) -> Result<String> {
+        let storage = self.storage.as_ref().ok_or(RustoraError::NoProjectOpen)?;
+
+        let name = match table_name {
+            Some(n) => n.to_string(),
+            None => format!("bytes_{}", self.next_counter()),
+        };
+
+        info!(format, table = %name, "importing bytes into session");
+        storage.import_bytes(data, format, &name)?;
+        self.record_source_step(&name, &format!("<memory:{}>", format));
+        Ok(name)
+    }
+
     /// Lazily scan a file via Polars (non-persistent, kept in memory).
     /// For backwards compatibility; prefer `import_file` for persistent storage.
     pub fn scan_file(&mut self, file_path: &str) -> Result<String> {
@@ -296,6 +326,27 @@ impl RustoraSession {
         Err(RustoraError::TableNotFound(name.to_string()))
     }
 
+    /// Get a preview of a dataset as a single Arrow RecordBatch, for in-process consumers
+    /// that can take Arrow memory directly (e.g. via the Arrow C Data Interface).
+    ///
+    /// DuckDB tables are read straight into a batch. Transient datasets are Polars frames,
+    /// which use a different Arrow implementation, so they still round-trip through IPC.
+    pub fn get_preview_batch(&self, name: &str, limit: u32) -> Result<RecordBatch> {
+        if let Some(storage) = &self.storage {
+            if storage.list_tables()?.contains(&name.to_string()) {
+                return storage.get_table_preview_batch(name, limit as u64);
+            }
+        }
+
+        if let Some(lf) = self.transient.get(name) {
+            let df = lf.clone().limit(limit).collect()?;
+            // Polars Arrow -> arrow-rs: convert through an in-memory IPC stream.
+            return storage::ipc_to_batch(&Self::dataframe_to_ipc_bytes(df)?);
+        }
+
+        Err(RustoraError::TableNotFound(name.to_string()))
+    }
+
     /// Get a paginated chunk of rows as Arrow IPC bytes.
     pub fn get_chunk_ipc(&self, name: &str, offset: u32, limit: u32) -> Result<Vec<u8>> {
         if let Some(storage) = &self.storage {
@@ -371,6 +422,19 @@ impl RustoraSession {
         columns: &[&str],
         descending: &[bool],
     ) -> Result<String> {
+        self.sort_dataset_counted(name, columns, descending)
+            .map(|(new_name, _)| new_name)
+    }
+
+    /// Like [`sort_dataset`](Self::sort_dataset), but also returns the row count when it
+    /// is known without extra work: `Some` for DuckDB tables (reported by the `CREATE
+    /// TABLE AS`), `None` for transient datasets, whose sort stays lazy.
+    pub fn sort_dataset_counted(
+        &mut self,
+        name: &str,
+        columns: &[&str],
+        descending: &[bool],
+    ) -> Result<(String, Option<usize>)> {
         if let Some(storage) = &self.storage {
             if storage.list_tables()?.contains(&name.to_string()) {
                 let order_clauses: Vec<String> = columns
@@ -386,12 +450,12 @@ impl RustoraSession {
                     order_clauses.join(", ")
                 );
                 let result_name = format!("{}_sorted", name);
-                storage.execute_sql_to_table(&sql, &result_name)?;
+                let (_, rows) = storage.execute_sql_to_table(&sql, &result_name)?;
                 self.record_step(name, &result_name, TransformStep::Sort {
                     columns: columns.iter().map(|c| c.to_string()).collect(),
                     descending: descending.to_vec(),
                 });
-                return Ok(result_name);
+                return Ok((result_name, Some(rows)));
             }
         }
 
@@ -406,7 +470,7 @@ impl RustoraSession {
                 columns: columns.iter().map(|c| c.to_string()).collect(),
                 descending: descending.to_vec(),
             });
-            return Ok(new_name);
+            return Ok((new_name, None));
         }
 
         Err(RustoraError::TableNotFound(name.to_string()))
@@ -432,6 +496,17 @@ impl RustoraSession {
         name: &str,
         where_clause: &str,
     ) -> Result<String> {
+        self.filter_dataset_sql_counted(name, where_clause)
+            .map(|(new_name, _)| new_name)
+    }
+
+    /// Like [`filter_dataset_sql`](Self::filter_dataset_sql), but also returns the
+    /// number of rows DuckDB inserted into the result table.
+    pub fn filter_dataset_sql_counted(
+        &mut self,
+        name: &str,
+        where_clause: &str,
+    ) -> Result<(String, usize)> {
         // For DuckDB tables, use SQL
         if let Some(storage) = &self.storage {
             if storage.list_tables()?.contains(&name.to_string()) {
@@ -440,11 +515,11 @@ impl RustoraSession {
                     name, where_clause
                 );
                 let result_name = format!("{}_filtered_{}", name, self.next_counter());
-                storage.execute_sql_to_table(&sql, &result_name)?;
+                let (_, rows) = storage.execute_sql_to_table(&sql, &result_name)?;
                 self.record_step(name, &result_name, TransformStep::Filter {
                     where_clause: where_clause.to_string(),
                 });
-                return Ok(result_name);
+                return Ok((result_name, rows));
             }
         }
 
@@ -942,6 +1017,24 @@ impl RustoraSession {
         Err(RustoraError::TableNotFound(name.to_string()))
     }
 
+    /// Export a dataset to an Arrow IPC file (Feather v2).
+    /// For transient LazyFrames, uses streaming sink to avoid loading the full dataset into memory.
+    pub fn export_to_feather(&self, name: &str, output_path: &str) -> Result<()> {
+        if let Some(storage) = &self.storage {
+            if storage.list_tables()?.contains(&name.to_string()) {
+                return storage.export_to_feather(name, output_path);
+            }
+        }
+
+        if let Some(lf) = self.transient.get(name) {
+            lf.clone()
+                .sink_ipc(&output_path, IpcWriterOptions::default(), None)?;
+            return Ok(());
+        }
+
+        Err(RustoraError::TableNotFound(name.to_string()))
+    }
+
     /// Export a dataset to CSV.
     /// For transient LazyFrames, uses streaming sink to avoid loading the full dataset into memory.
     pub fn export_to_csv(&self, name: &str, output_path: &str) -> Result<()> {
@@ -1046,6 +1139,21 @@ mod tests {
         assert!(!ipc.is_empty());
     }
 
+    #[test]
+    fn test_import_bytes() {
+        let csv = create_test_csv();
+        let data = std::fs::read(csv.path()).unwrap();
+
+        let mut session = RustoraSession::new();
+        let name = session.import_bytes(&data, "csv", Some("people")).unwrap();
+        assert_eq!(name, "people");
+        assert_eq!(session.get_row_count(&name).unwrap(), 5);
+
+        let auto_name = session.import_bytes(&data, "csv", None).unwrap();
+        assert_ne!(auto_name, "people");
+        assert!(session.list_datasets().contains(&auto_name));
+    }
+
     #[test]
     fn test_scan_file_transient() {
         let csv = create_test_csv();
@@ -1058,6 +1166,21 @@ mod tests {
         assert!(!ipc.is_empty());
     }
 
+    #[test]
+    fn test_preview_batch() {
+        let csv = create_test_csv();
+        let path = csv.path().to_str().unwrap();
+
+        let mut session = RustoraSession::new();
+        let name = session.import_file(path, Some("batch_test")).unwrap();
+        let batch = session.get_preview_batch(&name, 2).unwrap();
+        assert_eq!(batch.num_rows(), 2);
+
+        let scanned = session.scan_file(path).unwrap();
+        let batch = session.get_preview_batch(&scanned, 10).unwrap();
+        assert_eq!(batch.num_rows(), 5);
+    }
+
     #[test]
     fn test_dataset_info_persistent() {
         let csv = create_test_csv();
@@ -1134,6 +1257,32 @@ mod tests {
         assert!(!ipc.is_empty());
     }
 
+    #[test]
+    fn test_sort_and_filter_counted() {
+        let csv = create_test_csv();
+        let path = csv.path().to_str().unwrap();
+
+        let mut session = RustoraSession::new();
+        session.import_file(path, Some("counted")).unwrap();
+
+        let (sorted, rows) = session
+            .sort_dataset_counted("counted", &["age"], &[false])
+            .unwrap();
+        assert_eq!(rows, Some(session.get_row_count(&sorted).unwrap()));
+
+        let (filtered, rows) = session
+            .filter_dataset_sql_counted("counted", "age > 28")
+            .unwrap();
+        assert_eq!(rows, session.get_row_count(&filtered).unwrap());
+
+        // Transient sorts stay lazy, so no count is reported.
+        let scanned = session.scan_file(path).unwrap();
+        let (_, rows) = session
+            .sort_dataset_counted(&scanned, &["age"], &[false])
+            .unwrap();
+        assert_eq!(rows, None);
+    }
+
     #[test]
     fn test_export_csv() {
         let csv = create_test_csv();
@@ -1206,6 +1355,31 @@ mod tests {
         }
     }
 
+    #[test]
+    fn test_close_project() {
+        let dir = tempfile::tempdir().unwrap();
+        let db_path = dir.path().join("close_project.duckdb");
+        let db_path_str = db_path.to_str().unwrap();
+
+        let csv = create_test_csv();
+        let csv_path = csv.path().to_str().unwrap();
+
+        let mut session = RustoraSession::new();
+        session.new_project(db_path_str).unwrap();
+        session.import_file(csv_path, Some("my_data")).unwrap();
+        session.close_project();
+
+        assert!(session.project_path().is_none());
+        assert!(matches!(
+            session.import_file(csv_path, None),
+            Err(RustoraError::NoProjectOpen)
+        ));
+
+        let mut reopened = RustoraSession::new();
+        let tables = reopened.open_project(db_path_str).unwrap();
+        assert!(tables.contains(&"my_data".to_string()));
+    }
+
     #[test]
     fn test_filter_dataset_sql() {
         let csv = create_test_csv();
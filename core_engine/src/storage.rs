@@ -1,9 +1,24 @@
 use crate::error::{Result, RustoraError};
-use arrow_ipc::writer::StreamWriter;
+use arrow_ipc::reader::StreamReader;
+use arrow_ipc::writer::{FileWriter, StreamWriter};
+use duckdb::arrow::compute::concat_batches;
+use duckdb::arrow::datatypes::SchemaRef;
+use duckdb::arrow::record_batch::RecordBatch;
+use duckdb::vtab::{arrow_recordbatch_to_query_params, ArrowVTab};
 use duckdb::Connection;
+use polars::prelude::{
+    CompatLevel, CsvReadOptions, DataFrame, IpcReader, IpcStreamReader, IpcStreamWriter, SerReader,
+    SerWriter,
+};
+use std::fs::File;
+use std::io::{BufWriter, Cursor};
 use std::path::Path;
 use tracing::info;
 
+/// Most rows bound to one `arrow(?, ?)` scan. DuckDB's arrow table function emits each
+/// bound batch as a single data chunk, which holds at most `STANDARD_VECTOR_SIZE` rows.
+const ARROW_SCAN_MAX_ROWS: usize = 2048;
+
 /// Metadata about a table stored in DuckDB.
 #[derive(Debug, Clone)]
 pub struct TableInfo {
@@ -62,12 +77,15 @@ impl DuckStorage {
     }
 
     /// Tune the DuckDB connection for local desktop workloads.
+    /// Also registers the `arrow(?, ?)` table function used to ingest in-memory batches.
     fn configure_connection(conn: &Connection) -> Result<()> {
         conn.execute_batch(
             "SET enable_progress_bar = false;
              SET preserve_insertion_order = true;",
         )
         .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+        conn.register_table_function::<ArrowVTab>("arrow")
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
         Ok(())
     }
 
@@ -143,6 +161,89 @@ impl DuckStorage {
         Ok(())
     }
 
+    /// Import in-memory file contents into a persistent DuckDB table.
+    /// `format` is a file extension (csv, tsv, ipc, arrow, feather). The bytes are decoded
+    /// into Arrow batches and handed to DuckDB directly; nothing is written to disk.
+    /// Returns the sanitized table name used.
+    pub fn import_bytes(&self, data: &[u8], format: &str, table_name: &str) -> Result<String> {
+        let format = format.to_lowercase();
+        let safe_name = sanitize_table_name(table_name);
+        info!(table = %safe_name, format = %format, len = data.len(), "importing bytes into DuckDB");
+
+        let (schema, batches) = match format.as_str() {
+            "csv" | "tsv" => {
+                let delimiter = if format == "tsv" { b'\t' } else { b',' };
+                read_csv_batches(data, delimiter)?
+            }
+            "ipc" | "arrow" | "feather" => read_ipc_batches(data)?,
+            other => return Err(RustoraError::UnsupportedFormat(other.to_string())),
+        };
+        self.create_table_from_batches(&safe_name, schema, batches)?;
+
+        info!(table = %safe_name, "bytes imported successfully");
+        Ok(safe_name)
+    }
+
+    /// Create (or replace) a table from Arrow batches via the registered `arrow` table function.
+    ///
+    /// The `arrow` function emits each bound batch as one DuckDB data chunk, so batches are
+    /// fed in slices of at most [`ARROW_SCAN_MAX_ROWS`] rows. All statements run in one
+    /// transaction: a failure leaves any existing table with the same name untouched.
+    fn create_table_from_batches(
+        &self,
+        table_name: &str,
+        schema: SchemaRef,
+        batches: Vec<RecordBatch>,
+    ) -> Result<()> {
+        self.conn
+            .execute_batch("BEGIN TRANSACTION")
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+        match self.write_batch_slices(table_name, schema, &batches) {
+            Ok(()) => self
+                .conn
+                .execute_batch("COMMIT")
+                .map_err(|e| RustoraError::DuckDb(e.to_string())),
+            Err(e) => {
+                let _ = self.conn.execute_batch("ROLLBACK");
+                Err(e)
+            }
+        }
+    }
+
+    fn write_batch_slices(
+        &self,
+        table_name: &str,
+        schema: SchemaRef,
+        batches: &[RecordBatch],
+    ) -> Result<()> {
+        let create_sql = format!(
+            "CREATE OR REPLACE TABLE \"{}\" AS SELECT * FROM arrow(?, ?)",
+            table_name
+        );
+        self.conn
+            .execute(
+                &create_sql,
+                arrow_recordbatch_to_query_params(RecordBatch::new_empty(schema)),
+            )
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+
+        let insert_sql = format!("INSERT INTO \"{}\" SELECT * FROM arrow(?, ?)", table_name);
+        for batch in batches {
+            let mut offset = 0;
+            while offset < batch.num_rows() {
+                let len = ARROW_SCAN_MAX_ROWS.min(batch.num_rows() - offset);
+                self.conn
+                    .execute(
+                        &insert_sql,
+                        arrow_recordbatch_to_query_params(batch.slice(offset, len)),
+                    )
+                    .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+                offset += len;
+            }
+        }
+        Ok(())
+    }
+
     // -----------------------------------------------------------------------
     // Query Execution -> Arrow IPC bytes (ZERO JSON)
     // -----------------------------------------------------------------------
@@ -181,6 +282,32 @@ impl DuckStorage {
         Ok(buffer)
     }
 
+    /// Execute arbitrary SQL and collect the result into a single Arrow RecordBatch.
+    /// For in-process consumers that can take Arrow memory directly (no IPC encoding).
+    pub fn query_to_batch(&self, sql: &str) -> Result<RecordBatch> {
+        info!(sql_len = sql.len(), "executing SQL query to RecordBatch");
+        let mut stmt = self
+            .conn
+            .prepare(sql)
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+
+        let arrow_iter = stmt
+            .query_arrow([])
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+
+        let schema = arrow_iter.get_schema();
+        let batches: Vec<RecordBatch> = arrow_iter.collect();
+
+        concat_batches(&schema, &batches)
+            .map_err(|e| RustoraError::DuckDb(format!("Arrow concat error: {}", e)))
+    }
+
+    /// Get a preview of a table (first N rows) as a single Arrow RecordBatch.
+    pub fn get_table_preview_batch(&self, table_name: &str, limit: u64) -> Result<RecordBatch> {
+        let sql = format!("SELECT * FROM \"{}\" LIMIT {}", table_name, limit);
+        self.query_to_batch(&sql)
+    }
+
     /// Get a paginated chunk of a table as Arrow IPC bytes.
     pub fn get_table_chunk_ipc(
         &self,
@@ -205,10 +332,11 @@ impl DuckStorage {
     // -----------------------------------------------------------------------
 
     /// List all user tables in the database.
+    /// The statement is cached on the connection since nearly every session call runs it.
     pub fn list_tables(&self) -> Result<Vec<String>> {
         let mut stmt = self
             .conn
-            .prepare(
+            .prepare_cached(
                 "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main' AND table_name NOT LIKE '_rustora_%' ORDER BY table_name",
             )
             .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
@@ -286,11 +414,14 @@ impl DuckStorage {
     }
 
     /// Get the row count for a table.
+    /// Uses a cached prepared statement so repeated counts skip parsing and planning;
+    /// DuckDB rebinds it automatically if the table is replaced.
     pub fn table_row_count(&self, table_name: &str) -> Result<usize> {
         let sql = format!("SELECT COUNT(*) FROM \"{}\"", table_name);
         let count: i64 = self
             .conn
-            .query_row(&sql, [], |row| row.get(0))
+            .prepare_cached(&sql)
+            .and_then(|mut stmt| stmt.query_row([], |row| row.get(0)))
             .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
 
         Ok(count as usize)
@@ -307,16 +438,19 @@ impl DuckStorage {
 
     /// Execute a SQL statement that creates a result set and store it as a new table.
     /// Returns the table name.
-    pub fn execute_sql_to_table(&self, sql: &str, result_table: &str) -> Result<String> {
+    /// Materialize `sql` as a table. Returns the table name and the number of rows
+    /// DuckDB reports as inserted, so callers need no follow-up `COUNT(*)`.
+    pub fn execute_sql_to_table(&self, sql: &str, result_table: &str) -> Result<(String, usize)> {
         let safe_name = sanitize_table_name(result_table);
         let create_sql = format!(
             "CREATE OR REPLACE TABLE \"{}\" AS {}",
             safe_name, sql
         );
-        self.conn
-            .execute_batch(&create_sql)
+        let rows = self
+            .conn
+            .execute(&create_sql, [])
             .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
-        Ok(safe_name)
+        Ok((safe_name, rows))
     }
 
     // -----------------------------------------------------------------------
@@ -467,6 +601,40 @@ impl DuckStorage {
             .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
         Ok(())
     }
+
+    /// Export a table to an Arrow IPC file (Feather v2).
+    /// DuckDB's Arrow batches are written as-is, with no re-encoding or compression.
+    pub fn export_to_feather(&self, table_name: &str, output_path: &str) -> Result<()> {
+        let sql = format!("SELECT * FROM \"{}\"", table_name);
+        let mut stmt = self
+            .conn
+            .prepare(&sql)
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+
+        let arrow_iter = stmt
+            .query_arrow([])
+            .map_err(|e| RustoraError::DuckDb(e.to_string()))?;
+
+        let schema = arrow_iter.get_schema();
+        let file = BufWriter::new(File::create(output_path)?);
+
+        let mut writer = FileWriter::try_new(file, &schema)
+            .map_err(|e| RustoraError::DuckDb(format!("Arrow IPC write error: {}", e)))?;
+
+        for batch in arrow_iter {
+            if batch.num_rows() > 0 {
+                writer
+                    .write(&batch)
+                    .map_err(|e| RustoraError::DuckDb(format!("Arrow IPC write error: {}", e)))?;
+            }
+        }
+
+        writer
+            .finish()
+            .map_err(|e| RustoraError::DuckDb(format!("Arrow IPC finish error: {}", e)))?;
+
+        Ok(())
+    }
 }
 
 // ---------------------------------------------------------------------------
@@ -483,6 +651,58 @@ fn sanitize_table_name(name: &str) -> String {
         .collect()
 }
 
+/// Decode CSV bytes (with a header row) into batches, inferring the schema with Polars.
+fn read_csv_batches(data: &[u8], delimiter: u8) -> Result<(SchemaRef, Vec<RecordBatch>)> {
+    let df = CsvReadOptions::default()
+        .with_has_header(true)
+        .map_parse_options(|opts| opts.with_separator(delimiter))
+        .into_reader_with_file_handle(Cursor::new(data))
+        .finish()?;
+    dataframe_to_batches(df)
+}
+
+/// Decode Arrow IPC stream bytes into a single RecordBatch.
+pub(crate) fn ipc_to_batch(data: &[u8]) -> Result<RecordBatch> {
+    let (schema, batches) = read_ipc_stream_batches(data)?;
+    concat_batches(&schema, &batches)
+        .map_err(|e| RustoraError::DuckDb(format!("Arrow concat error: {}", e)))
+}
+
+/// Decode Arrow IPC bytes into batches. Accepts both the file (Feather v2) and stream formats,
+/// uncompressed or LZ4/ZSTD-compressed. Polars does the decoding since it already links the
+/// IPC compression codecs.
+fn read_ipc_batches(data: &[u8]) -> Result<(SchemaRef, Vec<RecordBatch>)> {
+    let df = if data.starts_with(b"ARROW1") {
+        IpcReader::new(Cursor::new(data)).finish()?
+    } else {
+        IpcStreamReader::new(Cursor::new(data)).finish()?
+    };
+    dataframe_to_batches(df)
+}
+
+/// Hand a Polars frame to arrow-rs through an uncompressed in-memory IPC stream.
+/// The oldest compat level keeps strings as `LargeUtf8` instead of view types, which
+/// DuckDB's `arrow` table function does not read.
+fn dataframe_to_batches(mut df: DataFrame) -> Result<(SchemaRef, Vec<RecordBatch>)> {
+    let mut buffer: Vec<u8> = Vec::new();
+    IpcStreamWriter::new(&mut buffer)
+        .with_compat_level(CompatLevel::oldest())
+        .finish(&mut df)?;
+    read_ipc_stream_batches(&buffer)
+}
+
+/// Decode uncompressed Arrow IPC stream bytes with arrow-rs.
+fn read_ipc_stream_batches(data: &[u8]) -> Result<(SchemaRef, Vec<RecordBatch>)> {
+    let map_err = |e: duckdb::arrow::error::ArrowError| {
+        RustoraError::DuckDb(format!("Arrow IPC read error: {}", e))
+    };
+    let reader = StreamReader::try_new(data, None).map_err(map_err)?;
+    let schema = reader.schema();
+    let batches = reader
+        .collect::<std::result::Result<Vec<_>, _>>()
+        .map_err(map_err)?;
+    Ok((schema, batches))
+}
 
 // ---------------------------------------------------------------------------
 // Tests
@@ -524,6 +744,98 @@ mod tests {
         assert!(info.column_names.contains(&"name".to_string()));
     }
 
+    #[test]
+    fn test_import_bytes_csv() {
+        let csv = create_test_csv();
+        let data = std::fs::read(csv.path()).unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        let table_name = storage.import_bytes(&data, "csv", "from_bytes").unwrap();
+
+        assert_eq!(table_name, "from_bytes");
+        let info = storage.table_info("from_bytes").unwrap();
+        assert_eq!(info.row_count, 5);
+        assert_eq!(info.num_columns, 4);
+    }
+
+    #[test]
+    fn test_import_bytes_ipc_round_trip() {
+        let csv = create_test_csv();
+        let csv_path = csv.path().to_str().unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage.import_file(csv_path, "source").unwrap();
+        let ipc = storage
+            .query_to_ipc("SELECT * FROM source WHERE age > 28")
+            .unwrap();
+
+        storage.import_bytes(&ipc, "arrow", "copy").unwrap();
+        assert_eq!(storage.table_row_count("copy").unwrap(), 3);
+    }
+
+    #[test]
+    fn test_import_bytes_large_csv() {
+        let mut data = String::from("id,label\n");
+        for i in 0..5000 {
+            data.push_str(&format!("{},row_{}\n", i, i));
+        }
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage
+            .import_bytes(data.as_bytes(), "csv", "large")
+            .unwrap();
+        assert_eq!(storage.table_row_count("large").unwrap(), 5000);
+
+        let ipc = storage.query_to_ipc("SELECT * FROM large").unwrap();
+        storage.import_bytes(&ipc, "ipc", "large_copy").unwrap();
+        assert_eq!(storage.table_row_count("large_copy").unwrap(), 5000);
+    }
+
+    #[test]
+    fn test_import_bytes_compressed_feather() {
+        use polars::prelude::{Column, IpcCompression, IpcWriter, NamedFrom};
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        for (codec, name) in [(IpcCompression::LZ4, "lz4"), (IpcCompression::ZSTD, "zstd")] {
+            let ids: Vec<i64> = (0..3000).collect();
+            let labels: Vec<String> = ids.iter().map(|i| format!("row_{}", i)).collect();
+            let mut frame = DataFrame::new(vec![
+                Column::new("id".into(), ids),
+                Column::new("label".into(), labels),
+            ])
+            .unwrap();
+
+            let mut data: Vec<u8> = Vec::new();
+            IpcWriter::new(&mut data)
+                .with_compression(Some(codec))
+                .finish(&mut frame)
+                .unwrap();
+
+            storage.import_bytes(&data, "feather", name).unwrap();
+            assert_eq!(storage.table_row_count(name).unwrap(), 3000);
+        }
+    }
+
+    #[test]
+    fn test_import_bytes_failure_keeps_existing_table() {
+        let csv = create_test_csv();
+        let data = std::fs::read(csv.path()).unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage.import_bytes(&data, "csv", "kept").unwrap();
+
+        let bad = b"name,age\nAlice,30\nBob,25,extra\n";
+        assert!(storage.import_bytes(bad, "csv", "kept").is_err());
+        assert_eq!(storage.table_row_count("kept").unwrap(), 5);
+    }
+
+    #[test]
+    fn test_import_bytes_unsupported_format() {
+        let storage = DuckStorage::open_in_memory().unwrap();
+        let result = storage.import_bytes(b"fake", "xlsx", "bad");
+        assert!(matches!(result, Err(RustoraError::UnsupportedFormat(_))));
+    }
+
     #[test]
     fn test_query_to_ipc() {
         let csv = create_test_csv();
@@ -538,6 +850,19 @@ mod tests {
         assert!(!ipc.is_empty());
     }
 
+    #[test]
+    fn test_table_preview_batch() {
+        let csv = create_test_csv();
+        let csv_path = csv.path().to_str().unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage.import_file(csv_path, "test_data").unwrap();
+
+        let batch = storage.get_table_preview_batch("test_data", 3).unwrap();
+        assert_eq!(batch.num_rows(), 3);
+        assert_eq!(batch.num_columns(), 4);
+    }
+
     #[test]
     fn test_table_chunk_ipc() {
         let csv = create_test_csv();
@@ -561,7 +886,7 @@ mod tests {
         let storage = DuckStorage::open_in_memory().unwrap();
         storage.import_file(csv_path, "people").unwrap();
 
-        let result = storage
+        let (result, rows) = storage
             .execute_sql_to_table("SELECT name, score FROM people WHERE age > 28", "high_age")
             .unwrap();
 
@@ -570,6 +895,7 @@ mod tests {
         let info = storage.table_info("high_age").unwrap();
         assert_eq!(info.num_columns, 2);
         assert!(info.row_count > 0);
+        assert_eq!(rows, info.row_count);
     }
 
     #[test]
@@ -587,6 +913,28 @@ mod tests {
         assert!(!storage.list_tables().unwrap().contains(&"to_drop".to_string()));
     }
 
+    #[test]
+    fn test_row_count_after_replace() {
+        let csv = create_test_csv();
+        let csv_path = csv.path().to_str().unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage.import_file(csv_path, "replaced").unwrap();
+        assert_eq!(storage.table_row_count("replaced").unwrap(), 5);
+
+        storage
+            .execute_sql_to_table("SELECT 1 AS x", "replaced")
+            .unwrap();
+        assert_eq!(storage.table_row_count("replaced").unwrap(), 1);
+
+        storage.drop_table("replaced").unwrap();
+        assert!(storage.table_row_count("replaced").is_err());
+        assert!(!storage
+            .list_tables()
+            .unwrap()
+            .contains(&"replaced".to_string()));
+    }
+
     #[test]
     fn test_export_csv() {
         let csv = create_test_csv();
@@ -604,6 +952,25 @@ mod tests {
         assert!(content.contains("Alice"));
     }
 
+    #[test]
+    fn test_export_feather() {
+        let csv = create_test_csv();
+        let csv_path = csv.path().to_str().unwrap();
+
+        let storage = DuckStorage::open_in_memory().unwrap();
+        storage.import_file(csv_path, "feather_test").unwrap();
+
+        let out = NamedTempFile::with_suffix(".arrow").unwrap();
+        let out_path = out.path().to_str().unwrap();
+
+        storage.export_to_feather("feather_test", out_path).unwrap();
+
+        let reader =
+            arrow_ipc::reader::FileReader::try_new(File::open(out_path).unwrap(), None).unwrap();
+        let rows: usize = reader.map(|b| b.unwrap().num_rows()).sum();
+        assert_eq!(rows, 5);
+    }
+
     #[test]
     fn test_persistent_storage() {
         let dir = tempfile::tempdir().unwrap();
@@ -0,0 +1,5 @@
+fn main() {
+    // Expose PyO3's `Py_3_*` / `Py_LIMITED_API` cfgs so the buffer protocol can be
+    // compiled in only where the targeted Python ABI supports it.
+    pyo3_build_config::use_pyo3_cfgs();
+}
@@ -1,22 +1,46 @@
 """Type stubs for the rustora native extension module."""
 
-from typing import Optional
+from types import TracebackType
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import pyarrow
+
+class IpcBuffer:
+    """Read-only Arrow IPC stream bytes owned by the native extension.
+
+    Supports the buffer protocol, so it can be passed directly to
+    ``pyarrow.ipc.open_stream`` or wrapped in a ``memoryview`` without copying.
+    Use ``bytes(buf)`` when an owned copy is required.
+
+    Stable-ABI builds for Python below 3.11 (the optional ``abi3-py39``
+    feature) cannot implement the buffer protocol: they do not define this
+    class and return plain ``bytes`` instead. Both work with ``memoryview``
+    and ``pyarrow``.
+    """
+
+    def __len__(self) -> int: ...
+    def __bytes__(self) -> bytes: ...
+    def __buffer__(self, flags: int, /) -> memoryview: ...
 
 class Session:
     """Core session managing all data operations.
 
     .. note::
-        ``Session`` is **not thread-safe** and must be used from a single thread.
-        Do not share a ``Session`` instance across threads.
+        A ``Session`` may be shared across threads. Every call releases the GIL
+        while the engine runs, so other Python threads keep running, but calls
+        on the same session are serialized. If an engine call panics, that call
+        raises ``pyo3_runtime.PanicException`` and the session remains usable;
+        whatever the failed call was changing may be left incomplete.
 
     Usage::
 
         import rustora
 
-        session = rustora.Session()
-        session.new_project("analysis.duckdb")
-        session.import_file("data.csv")          # table_name is optional
-        ipc_bytes = session.get_preview("my_table", 100)
+        with rustora.Session() as session:
+            session.new_project("analysis.duckdb")
+            session.import_file("data.csv")      # table_name is optional
+            ipc_bytes = session.get_preview("my_table", 100)
     """
 
     def __init__(self) -> None:
@@ -65,6 +89,55 @@ class Session:
         """
         ...
 
+    def import_bytes(
+        self,
+        data: Union[bytes, bytearray, memoryview, IpcBuffer],
+        format: str,
+        table_name: Optional[str] = None,
+    ) -> str:
+        """Import in-memory file contents as a persistent table.
+
+        ``data`` may be any buffer-protocol object (``bytes``, ``memoryview``,
+        ``IpcBuffer``, ...). It is copied once before the GIL is released, so
+        the caller may keep mutating it; nothing is written to disk.
+
+        Args:
+            data: The raw file contents.
+            format: File format as an extension: ``"csv"``, ``"tsv"``, or
+                ``"ipc"`` / ``"arrow"`` / ``"feather"`` (file or stream format,
+                optionally LZ4/ZSTD-compressed).
+            table_name: Optional name for the table. Auto-generated if omitted.
+
+        Returns:
+            The table name used in the database.
+
+        Raises:
+            ValueError: If the format is unsupported.
+            RuntimeError: If no project is open or the data cannot be parsed.
+        """
+        ...
+
+    def bulk_import(self, specs: list[tuple[str, Optional[str]]]) -> list[str]:
+        """Import several files in a single call.
+
+        Equivalent to calling ``import_file`` for each spec, but crosses the
+        Python/Rust boundary only once. Stops at the first failing import;
+        tables imported from earlier specs are kept.
+
+        Args:
+            specs: ``(path, table_name)`` tuples. ``table_name`` may be ``None``
+                to auto-generate a name from the filename.
+
+        Returns:
+            The table names used, in the same order as ``specs``.
+
+        Raises:
+            FileNotFoundError: If a file does not exist.
+            ValueError: If a file format is unsupported.
+            RuntimeError: If no project is open.
+        """
+        ...
+
     def scan_file(self, path: str) -> str:
         """Lazily scan a file via Polars (transient, not persisted).
 
@@ -94,24 +167,42 @@ class Session:
         """
         ...
 
-    def get_preview(self, name: str, limit: int) -> bytes:
-        """Get a preview of a dataset as Arrow IPC stream bytes.
+    def get_preview(self, name: str, limit: int) -> Union[IpcBuffer, bytes]:
+        """Get a preview of a dataset as an Arrow IPC stream buffer.
 
         Args:
             name: Dataset / table name.
             limit: Maximum number of rows to return. Must be non-negative.
 
         Returns:
-            Arrow IPC stream bytes. Parse with ``pyarrow.ipc.open_stream``
-            or ``polars.read_ipc(io.BytesIO(data))``.
+            Arrow IPC stream buffer. Parse with ``pyarrow.ipc.open_stream(buf)``
+            or ``polars.read_ipc_stream(memoryview(buf))``.
 
         Raises:
             RuntimeError: If the dataset is not found.
         """
         ...
 
-    def get_chunk(self, name: str, offset: int, limit: int) -> bytes:
-        """Get a paginated chunk of rows as Arrow IPC stream bytes.
+    def preview_arrow(self, name: str, limit: int) -> "pyarrow.RecordBatch":
+        """Get a preview of a dataset as a ``pyarrow.RecordBatch``.
+
+        The batch is handed to pyarrow through the Arrow C Data Interface, so
+        unlike ``get_preview`` the result needs no IPC decoding on the Python
+        side. For project tables there is no IPC step at all; transient datasets
+        from ``scan_file`` are still converted through IPC inside the engine.
+
+        Args:
+            name: Dataset / table name.
+            limit: Maximum number of rows to return. Must be non-negative.
+
+        Raises:
+            ModuleNotFoundError: If pyarrow is not installed.
+            RuntimeError: If the dataset is not found.
+        """
+        ...
+
+    def get_chunk(self, name: str, offset: int, limit: int) -> Union[IpcBuffer, bytes]:
+        """Get a paginated chunk of rows as an Arrow IPC stream buffer.
 
         Args:
             name: Dataset / table name.
@@ -119,7 +210,7 @@ class Session:
             limit: Maximum number of rows to return. Must be non-negative.
 
         Returns:
-            Arrow IPC stream bytes.
+            Arrow IPC stream buffer.
 
         Raises:
             RuntimeError: If the dataset is not found.
@@ -140,8 +231,8 @@ class Session:
         """
         ...
 
-    def query_to_ipc(self, sql: str) -> bytes:
-        """Execute a SQL query and return results directly as Arrow IPC bytes.
+    def query_to_ipc(self, sql: str) -> Union[IpcBuffer, bytes]:
+        """Execute a SQL query and return results directly as an Arrow IPC buffer.
 
         Unlike ``execute_sql``, this does not persist the result as a table.
 
@@ -149,15 +240,17 @@ class Session:
             sql: A valid SQL SELECT statement.
 
         Returns:
-            Arrow IPC stream bytes.
+            Arrow IPC stream buffer.
 
         Raises:
             RuntimeError: If no project is open or SQL execution fails.
         """
         ...
 
-    def sort_dataset(self, name: str, columns: list[str], descending: list[bool]) -> str:
-        """Sort a dataset by one or more columns. Returns the new dataset name.
+    def sort_dataset(
+        self, name: str, columns: list[str], descending: list[bool]
+    ) -> tuple[str, Optional[int]]:
+        """Sort a dataset by one or more columns.
 
         Args:
             name: Source dataset / table name.
@@ -165,7 +258,9 @@ class Session:
             descending: Parallel list of booleans (True = descending).
 
         Returns:
-            The name of the new sorted dataset.
+            ``(name, row_count)`` of the new sorted dataset. ``row_count`` is
+            ``None`` for transient datasets, whose sort is not evaluated until
+            the data is read; call ``get_row_count`` if it is needed.
 
         Raises:
             ValueError: If ``columns`` and ``descending`` have different lengths, or if
@@ -173,15 +268,15 @@ class Session:
         """
         ...
 
-    def filter_sql(self, name: str, where_clause: str) -> str:
-        """Filter a dataset using a SQL WHERE clause. Returns the new dataset name.
+    def filter_sql(self, name: str, where_clause: str) -> tuple[str, int]:
+        """Filter a dataset using a SQL WHERE clause.
 
         Args:
             name: Source dataset / table name.
             where_clause: SQL predicate, e.g. ``"age > 30 AND city = 'Boston'"``.
 
         Returns:
-            The name of the new filtered dataset.
+            ``(name, row_count)`` of the new filtered dataset.
 
         Raises:
             RuntimeError: If the dataset is not found or SQL is invalid.
@@ -212,6 +307,22 @@ class Session:
         """
         ...
 
+    def export_feather(self, name: str, output_path: str) -> None:
+        """Export a dataset to an Arrow IPC file (Feather v2).
+
+        Cheaper than Parquet: the Arrow batches are written without re-encoding
+        or compression. Read back with ``pyarrow.ipc.open_file`` or
+        ``pyarrow.feather.read_table``.
+
+        Args:
+            name: Dataset / table name.
+            output_path: Destination file path.
+
+        Raises:
+            RuntimeError: If the dataset is not found or the path is not writable.
+        """
+        ...
+
     def remove_dataset(self, name: str) -> bool:
         """Remove a dataset (drops DuckDB table or removes transient scan).
 
@@ -222,3 +333,21 @@ class Session:
             True if the dataset was found and removed, False otherwise.
         """
         ...
+
+    def close(self) -> None:
+        """Close the project, releasing the DuckDB connection and file lock immediately.
+
+        Transient datasets are discarded. Subsequent operations raise
+        ``RuntimeError`` until ``new_project`` or ``open_project`` is called.
+        """
+        ...
+
+    def __enter__(self) -> "Session": ...
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the session on leaving a ``with`` block."""
+        ...
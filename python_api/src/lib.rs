@@ -1,10 +1,28 @@
+use core_engine::arrow::array::{Array, StructArray};
+use core_engine::arrow::ffi::{to_ffi, FFI_ArrowArray, FFI_ArrowSchema};
 use core_engine::RustoraSession;
 use pyo3::exceptions::{PyFileNotFoundError, PyIOError, PyRuntimeError, PyValueError};
 use pyo3::prelude::*;
 use pyo3::types::PyBytes;
+#[cfg(not(any(Py_3_11, not(Py_LIMITED_API))))]
+use pyo3::types::PyMemoryView;
+use std::sync::{Mutex, PoisonError};
+#[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+use {
+    pyo3::buffer::PyBuffer,
+    pyo3::exceptions::PyBufferError,
+    pyo3::ffi,
+    std::os::raw::{c_char, c_int, c_void},
+    std::ptr,
+};
 
 /// Python wrapper for the Rustora core engine session.
 ///
+/// The engine sits behind a mutex and every call releases the GIL while it runs,
+/// so a session can be shared across Python threads: engine calls are serialized,
+/// but other Python threads keep running in the meantime. A panic inside one call is
+/// raised as `PanicException` and the session stays usable afterwards.
+///
 /// Usage:
 ///   import rustora
 ///   session = rustora.Session()
@@ -12,9 +30,10 @@ use pyo3::types::PyBytes;
 ///   session.import_file("data.csv", None)  # table_name is optional; auto-generated if omitted
 ///   tables = session.list_datasets()
 ///   ipc_bytes = session.get_preview("my_table", 100)
-#[pyclass(unsendable)]
+///   table = pyarrow.ipc.open_stream(ipc_bytes).read_all()
+#[pyclass(frozen)]
 struct Session {
-    inner: RustoraSession,
+    inner: Mutex<RustoraSession>,
 }
 
 #[pymethods]
@@ -22,98 +41,133 @@ impl Session {
     #[new]
     fn new() -> Self {
         Session {
-            inner: RustoraSession::new(),
+            inner: Mutex::new(RustoraSession::new()),
         }
     }
 
     /// Create a new persistent project (.duckdb file).
-    fn new_project(&mut self, path: &str) -> PyResult<()> {
-        self.inner
-            .new_project(path)
-            .map_err(map_err)
+    fn new_project(&self, py: Python<'_>, path: &str) -> PyResult<()> {
+        self.run(py, |s| s.new_project(path))
     }
 
     /// Open an existing project (.duckdb file). Returns list of table names.
-    fn open_project(&mut self, path: &str) -> PyResult<Vec<String>> {
-        self.inner
-            .open_project(path)
-            .map_err(map_err)
+    fn open_project(&self, py: Python<'_>, path: &str) -> PyResult<Vec<String>> {
+        self.run(py, |s| s.open_project(path))
     }
 
     /// Import a file into the DuckDB project as a persistent table.
     /// Returns the table name used.
-    fn import_file(&mut self, path: &str, table_name: Option<&str>) -> PyResult<String> {
-        self.inner
-            .import_file(path, table_name)
-            .map_err(map_err)
+    fn import_file(
+        &self,
+        py: Python<'_>,
+        path: &str,
+        table_name: Option<&str>,
+    ) -> PyResult<String> {
+        self.run(py, |s| s.import_file(path, table_name))
+    }
+
+    /// Import in-memory file contents from any buffer-protocol object (bytes, memoryview, ...)
+    /// as a persistent table, without a temporary file. Returns the table name used.
+    fn import_bytes(
+        &self,
+        py: Python<'_>,
+        data: &Bound<'_, PyAny>,
+        format: &str,
+        table_name: Option<&str>,
+    ) -> PyResult<String> {
+        // Copy while the GIL is held: once it is released, another thread could
+        // write to a mutable buffer (bytearray, numpy array, ...) mid-parse.
+        let bytes = buffer_to_vec(data)?;
+        self.run(py, |s| s.import_bytes(&bytes, format, table_name))
+    }
+
+    /// Import several files in one call. Each spec is a `(path, table_name)` tuple.
+    /// Returns the table names used, in the same order as `specs`.
+    fn bulk_import(
+        &self,
+        py: Python<'_>,
+        specs: Vec<(String, Option<String>)>,
+    ) -> PyResult<Vec<String>> {
+        self.run(py, |s| {
+            specs
+                .iter()
+                .map(|(path, table_name)| s.import_file(path, table_name.as_deref()))
+                .collect()
+        })
     }
 
     /// Scan a file using Polars (transient, not persisted).
-    fn scan_file(&mut self, path: &str) -> PyResult<String> {
-        self.inner
-            .scan_file(path)
-            .map_err(map_err)
+    fn scan_file(&self, py: Python<'_>, path: &str) -> PyResult<String> {
+        self.run(py, |s| s.scan_file(path))
     }
 
     /// List all available datasets (persistent + transient).
-    fn list_datasets(&self) -> Vec<String> {
-        self.inner.list_datasets()
+    fn list_datasets(&self, py: Python<'_>) -> PyResult<Vec<String>> {
+        self.run(py, |s| Ok(s.list_datasets()))
     }
 
     /// Get total row count for a dataset.
-    fn get_row_count(&self, name: &str) -> PyResult<usize> {
-        self.inner
-            .get_row_count(name)
-            .map_err(map_err)
+    fn get_row_count(&self, py: Python<'_>, name: &str) -> PyResult<usize> {
+        self.run(py, |s| s.get_row_count(name))
     }
 
-    /// Get a preview of a dataset as Arrow IPC bytes.
-    fn get_preview<'py>(&self, py: Python<'py>, name: &str, limit: u32) -> PyResult<Bound<'py, PyBytes>> {
-        let bytes = self
-            .inner
-            .get_preview_ipc(name, limit)
-            .map_err(map_err)?;
-        Ok(PyBytes::new(py, &bytes))
+    /// Get a preview of a dataset as an Arrow IPC buffer.
+    fn get_preview(&self, py: Python<'_>, name: &str, limit: u32) -> PyResult<PyObject> {
+        self.run(py, |s| s.get_preview_ipc(name, limit))
+            .and_then(|data| ipc_payload(py, data))
     }
 
-    /// Get a paginated chunk of rows as Arrow IPC bytes.
-    fn get_chunk<'py>(
+    /// Get a preview of a dataset as a `pyarrow.RecordBatch`.
+    /// The batch is handed over through the Arrow C Data Interface, so pyarrow does
+    /// not decode IPC. Transient (`scan_file`) datasets are still converted through
+    /// IPC inside the engine. Requires pyarrow.
+    fn preview_arrow<'py>(
         &self,
         py: Python<'py>,
         name: &str,
-        offset: u32,
         limit: u32,
-    ) -> PyResult<Bound<'py, PyBytes>> {
-        let bytes = self
-            .inner
-            .get_chunk_ipc(name, offset, limit)
-            .map_err(map_err)?;
-        Ok(PyBytes::new(py, &bytes))
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let batch = self.run(py, |s| s.get_preview_batch(name, limit))?;
+        let data = StructArray::from(batch).into_data();
+        let (mut array, mut schema) =
+            to_ffi(&data).map_err(|e| PyRuntimeError::new_err(e.to_string()))?;
+
+        // pyarrow moves the contents out of both structs; the emptied structs drop here.
+        py.import("pyarrow")?.getattr("RecordBatch")?.call_method1(
+            "_import_from_c",
+            (
+                &mut array as *mut FFI_ArrowArray as usize,
+                &mut schema as *mut FFI_ArrowSchema as usize,
+            ),
+        )
+    }
+
+    /// Get a paginated chunk of rows as an Arrow IPC buffer.
+    fn get_chunk(&self, py: Python<'_>, name: &str, offset: u32, limit: u32) -> PyResult<PyObject> {
+        self.run(py, |s| s.get_chunk_ipc(name, offset, limit))
+            .and_then(|data| ipc_payload(py, data))
     }
 
     /// Execute a SQL query. Returns the result table name.
-    fn execute_sql(&mut self, sql: &str) -> PyResult<String> {
-        self.inner
-            .execute_sql(sql)
-            .map_err(map_err)
+    fn execute_sql(&self, py: Python<'_>, sql: &str) -> PyResult<String> {
+        self.run(py, |s| s.execute_sql(sql))
     }
 
-    /// Execute a SQL query and return results as Arrow IPC bytes.
-    fn query_to_ipc<'py>(&self, py: Python<'py>, sql: &str) -> PyResult<Bound<'py, PyBytes>> {
-        let bytes = self
-            .inner
-            .execute_sql_to_ipc(sql)
-            .map_err(map_err)?;
-        Ok(PyBytes::new(py, &bytes))
+    /// Execute a SQL query and return results as an Arrow IPC buffer.
+    fn query_to_ipc(&self, py: Python<'_>, sql: &str) -> PyResult<PyObject> {
+        self.run(py, |s| s.execute_sql_to_ipc(sql))
+            .and_then(|data| ipc_payload(py, data))
     }
 
-    /// Sort a dataset. Returns the new dataset name.
+    /// Sort a dataset. Returns the new dataset name and its row count, or `None` for
+    /// the count when the dataset is transient (the sort stays lazy).
     fn sort_dataset(
-        &mut self,
+        &self,
+        py: Python<'_>,
         name: &str,
         columns: Vec<String>,
         descending: Vec<bool>,
-    ) -> PyResult<String> {
+    ) -> PyResult<(String, Option<usize>)> {
         if columns.len() != descending.len() {
             return Err(PyValueError::new_err(format!(
                 "columns and descending must have the same length (got {} vs {})",
@@ -122,40 +176,185 @@ impl Session {
             )));
         }
         let col_refs: Vec<&str> = columns.iter().map(|s| s.as_str()).collect();
-        self.inner
-            .sort_dataset(name, &col_refs, &descending)
-            .map_err(map_err)
+        self.run(py, |s| s.sort_dataset_counted(name, &col_refs, &descending))
     }
 
-    /// Filter a dataset using a SQL WHERE clause. Returns the new dataset name.
-    fn filter_sql(&mut self, name: &str, where_clause: &str) -> PyResult<String> {
-        self.inner
-            .filter_dataset_sql(name, where_clause)
-            .map_err(map_err)
+    /// Filter a dataset using a SQL WHERE clause.
+    /// Returns the new dataset name and its row count.
+    fn filter_sql(
+        &self,
+        py: Python<'_>,
+        name: &str,
+        where_clause: &str,
+    ) -> PyResult<(String, usize)> {
+        self.run(py, |s| s.filter_dataset_sql_counted(name, where_clause))
     }
 
     /// Export a dataset to CSV.
-    fn export_csv(&self, name: &str, output_path: &str) -> PyResult<()> {
-        self.inner
-            .export_to_csv(name, output_path)
-            .map_err(map_err)
+    fn export_csv(&self, py: Python<'_>, name: &str, output_path: &str) -> PyResult<()> {
+        self.run(py, |s| s.export_to_csv(name, output_path))
     }
 
     /// Export a dataset to Parquet.
-    fn export_parquet(&self, name: &str, output_path: &str) -> PyResult<()> {
-        self.inner
-            .export_to_parquet(name, output_path)
-            .map_err(map_err)
+    fn export_parquet(&self, py: Python<'_>, name: &str, output_path: &str) -> PyResult<()> {
+        self.run(py, |s| s.export_to_parquet(name, output_path))
+    }
+
+    /// Export a dataset to an Arrow IPC file (Feather v2).
+    fn export_feather(&self, py: Python<'_>, name: &str, output_path: &str) -> PyResult<()> {
+        self.run(py, |s| s.export_to_feather(name, output_path))
     }
 
     /// Remove a dataset.
-    fn remove_dataset(&mut self, name: &str) -> PyResult<bool> {
-        self.inner
-            .remove_dataset(name)
-            .map_err(map_err)
+    fn remove_dataset(&self, py: Python<'_>, name: &str) -> PyResult<bool> {
+        self.run(py, |s| s.remove_dataset(name))
+    }
+
+    /// Close the project, releasing the DuckDB connection and file lock immediately.
+    fn close(&self, py: Python<'_>) -> PyResult<()> {
+        self.run(py, |s| {
+            s.close_project();
+            Ok(())
+        })
+    }
+
+    fn __enter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __exit__(
+        &self,
+        py: Python<'_>,
+        _exc_type: &Bound<'_, PyAny>,
+        _exc_value: &Bound<'_, PyAny>,
+        _traceback: &Bound<'_, PyAny>,
+    ) -> PyResult<()> {
+        self.close(py)
+    }
+}
+
+impl Session {
+    /// Run `f` against the engine with the GIL released.
+    /// The session mutex is only taken inside `allow_threads`, so a thread waiting
+    /// for it never holds the GIL.
+    fn run<T, F>(&self, py: Python<'_>, f: F) -> PyResult<T>
+    where
+        T: Send,
+        F: FnOnce(&mut RustoraSession) -> core_engine::Result<T> + Send,
+    {
+        py.allow_threads(|| {
+            // A panic in an earlier call poisons the mutex; it surfaced as a PanicException
+            // then, so keep the session usable rather than failing every later call.
+            let mut inner = self.inner.lock().unwrap_or_else(PoisonError::into_inner);
+            f(&mut inner).map_err(map_err)
+        })
+    }
+}
+
+/// Hand engine IPC bytes to Python: a zero-copy [`IpcBuffer`] where the build can
+/// implement the buffer protocol, otherwise a plain `bytes` copy.
+///
+/// Under the stable ABI, `__getbuffer__` needs Python 3.11, so abi3 builds for older
+/// interpreters (the optional `abi3-py39` feature) fall back to `bytes`. The default
+/// per-interpreter build always returns `IpcBuffer`.
+fn ipc_payload(py: Python<'_>, data: Vec<u8>) -> PyResult<PyObject> {
+    #[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+    let payload = Py::new(py, IpcBuffer::from(data))?.into_any();
+    #[cfg(not(any(Py_3_11, not(Py_LIMITED_API))))]
+    let payload = PyBytes::new(py, &data).into_any().unbind();
+    Ok(payload)
+}
+
+/// Read-only Arrow IPC stream bytes exposed through the Python buffer protocol.
+///
+/// The buffer owns the `Vec<u8>` produced by the core engine, so consumers such as
+/// `pyarrow.ipc.open_stream` or `memoryview` read the payload in place instead of
+/// going through an intermediate `bytes` copy.
+#[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+#[pyclass(frozen)]
+struct IpcBuffer {
+    data: Vec<u8>,
+}
+
+#[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+impl From<Vec<u8>> for IpcBuffer {
+    fn from(data: Vec<u8>) -> Self {
+        IpcBuffer { data }
     }
 }
 
+#[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+#[pymethods]
+impl IpcBuffer {
+    fn __len__(&self) -> usize {
+        self.data.len()
+    }
+
+    /// Copy the payload into a Python `bytes` object.
+    fn __bytes__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        PyBytes::new(py, &self.data)
+    }
+
+    /// # Safety
+    /// `view` must be a valid `Py_buffer` pointer supplied by the interpreter.
+    unsafe fn __getbuffer__(
+        slf: Bound<'_, Self>,
+        view: *mut ffi::Py_buffer,
+        flags: c_int,
+    ) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("IpcBuffer is read-only"));
+        }
+
+        let data = &slf.get().data;
+        (*view).buf = data.as_ptr() as *mut c_void;
+        (*view).len = data.len() as ffi::Py_ssize_t;
+        (*view).readonly = 1;
+        (*view).itemsize = 1;
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            b"B\0".as_ptr() as *mut c_char
+        } else {
+            ptr::null_mut()
+        };
+        (*view).ndim = 1;
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            &mut (*view).len
+        } else {
+            ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+            &mut (*view).itemsize
+        } else {
+            ptr::null_mut()
+        };
+        (*view).suboffsets = ptr::null_mut();
+        (*view).internal = ptr::null_mut();
+        // The view keeps the owning object (and therefore `data`) alive.
+        (*view).obj = slf.into_any().into_ptr();
+        Ok(())
+    }
+}
+
+/// Copy the contents of a buffer-protocol object into an owned `Vec<u8>`.
+#[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+fn buffer_to_vec(data: &Bound<'_, PyAny>) -> PyResult<Vec<u8>> {
+    PyBuffer::<u8>::get(data)?.to_vec(data.py())
+}
+
+/// Copy the contents of a buffer-protocol object into an owned `Vec<u8>`.
+/// `PyBuffer` is unavailable under the stable ABI before Python 3.11, so go through
+/// `bytes(memoryview(data))` instead. The `memoryview` step rejects non-buffers with
+/// `TypeError`; `bytes()` alone would also accept ints and iterables.
+#[cfg(not(any(Py_3_11, not(Py_LIMITED_API))))]
+fn buffer_to_vec(data: &Bound<'_, PyAny>) -> PyResult<Vec<u8>> {
+    let view = PyMemoryView::from(data)?;
+    let bytes = data.py().get_type::<PyBytes>().call1((view,))?;
+    Ok(bytes.downcast_into::<PyBytes>()?.as_bytes().to_vec())
+}
+
 /// Map a [`core_engine::error::RustoraError`] to the most appropriate Python exception type.
 /// Provides richer error semantics than mapping everything to `RuntimeError`.
 fn map_err(e: core_engine::RustoraError) -> pyo3::PyErr {
@@ -175,5 +374,7 @@ fn map_err(e: core_engine::RustoraError) -> pyo3::PyErr {
 #[pymodule]
 fn rustora(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<Session>()?;
+    #[cfg(any(Py_3_11, not(Py_LIMITED_API)))]
+    m.add_class::<IpcBuffer>()?;
     Ok(())
 }
@@ -8,171 +8,293 @@ Build and install first:
 
 Then run:
     python test_smoke.py
+
+Pass ``--full`` (or set ``RUSTORA_FULL_SMOKE=1``) to also decode every Arrow IPC
+payload with pyarrow and run the slower Parquet read-back checks. By default IPC
+payloads are only checked for the stream framing marker.
 """
 
-import io
 import os
+import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+import rustora
+from rustora import Session
 
-def main():
-    import rustora
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pa = pa_csv = pa_ipc = pq = None
+    HAS_PYARROW = False
+
+FULL = "--full" in sys.argv or os.environ.get("RUSTORA_FULL_SMOKE", "") not in ("", "0")
+
+# Every Arrow IPC stream message starts with the 0xFFFFFFFF continuation marker.
+IPC_CONTINUATION = b"\xff\xff\xff\xff"
+
+
+def check(cond, msg):
+    """Raise ``AssertionError(msg)`` unless ``cond`` holds.
+
+    Used instead of ``assert`` so the checks still run under ``python -O``.
+    """
+    if not cond:
+        raise AssertionError(msg)
+
+
+def _is_ipc_stream(buf):
+    """Cheap framing check: non-empty and starts with an IPC continuation marker."""
+    view = memoryview(buf)
+    return len(view) >= 8 and view[:4] == IPC_CONTINUATION
 
+
+def _scalar(session, sql):
+    """Run ``sql`` through ``query_to_ipc`` and return the first value of the first column."""
+    reader = pa_ipc.open_stream(memoryview(session.query_to_ipc(sql)))
+    return reader.read_all().column(0)[0].as_py()
+
+
+def _expect(exc, fn, *args, label=""):
+    """Call ``fn(*args)`` and assert that it raises ``exc``."""
+    try:
+        fn(*args)
+    except exc as e:
+        print(f"[OK] {label}: {exc.__name__}: {e}")
+    else:
+        raise AssertionError(f"Expected {exc.__name__} for {label}")
+
+
+def main():
     # ── Session creation ──────────────────────────────────────────────────
-    session = rustora.Session()
+    session = Session()
     print("[OK] Session created")
 
     with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = os.path.join(tmpdir, "test.duckdb")
+        base = Path(tmpdir)
+        db_path = str(base / "test.duckdb")
         session.new_project(db_path)
         print(f"[OK] Project created: {db_path}")
 
         # ── CSV creation ──────────────────────────────────────────────────
-        csv_path = os.path.join(tmpdir, "test.csv")
-        with open(csv_path, "w") as f:
-            f.write("name,age,city,score\n")
-            f.write("Alice,30,New York,95.5\n")
-            f.write("Bob,25,San Francisco,88.0\n")
-            f.write("Charlie,35,Chicago,72.3\n")
-
-        # ── import_file (with explicit table_name) ────────────────────────
-        table_name = session.import_file(csv_path, "test_data")
+        csv_path = str(base / "test.csv")
+        if HAS_PYARROW:
+            fixture = pa.table({
+                "name": ["Alice", "Bob", "Charlie"],
+                "age": [30, 25, 35],
+                "city": ["New York", "San Francisco", "Chicago"],
+                "score": [95.5, 88.0, 72.3],
+            })
+            pa_csv.write_csv(fixture, csv_path)
+        else:
+            with open(csv_path, "w") as f:
+                f.write(
+                    "name,age,city,score\n"
+                    "Alice,30,New York,95.5\n"
+                    "Bob,25,San Francisco,88.0\n"
+                    "Charlie,35,Chicago,72.3\n"
+                )
+
+        # ── import_bytes (in-memory, explicit table_name) ─────────────────
+        with open(csv_path, "rb") as f:
+            csv_data = f.read()
+        table_name = session.import_bytes(memoryview(csv_data), "csv", "test_data")
         print(f"[OK] Imported as: {table_name}")
-        assert table_name == "test_data"
-
-        # ── import_file (auto-generated table_name) ───────────────────────
-        auto_name = session.import_file(csv_path)
-        print(f"[OK] Auto-named import: {auto_name}")
-        assert auto_name != "test_data"
+        check(table_name == "test_data", f"Unexpected table name: {table_name}")
+        _expect(TypeError, session.import_bytes, 5, "csv", label="import_bytes non-buffer")
+        _expect(TypeError, session.import_bytes, [1, 2], "csv", label="import_bytes list")
+
+        # ── bulk_import (several specs, names returned in order) ──────────
+        bulk_names = session.bulk_import([(csv_path, "bulk_a"), (csv_path, None)])
+        print(f"[OK] bulk_import: {bulk_names}")
+        check(len(bulk_names) == 2, f"Expected 2 table names, got {bulk_names}")
+        bulk_a, auto_name = bulk_names
+        check(bulk_a == "bulk_a", f"bulk_import names out of order: {bulk_names}")
+        check(auto_name not in ("test_data", "bulk_a"),
+              f"Auto-generated name collided with an explicit table name: {auto_name}")
+        check(session.get_row_count(bulk_a) == 3, "bulk_import table has wrong row count")
 
         # ── list_datasets ─────────────────────────────────────────────────
         datasets = session.list_datasets()
         print(f"[OK] Datasets: {datasets}")
-        assert "test_data" in datasets
+        check("test_data" in datasets, f"test_data missing from datasets: {datasets}")
 
         # ── get_row_count ─────────────────────────────────────────────────
         count = session.get_row_count("test_data")
         print(f"[OK] Row count: {count}")
-        assert count == 3
+        check(count == 3, f"Expected 3 rows, got {count}")
 
         # ── get_preview -- validate Arrow IPC format ──────────────────────
         ipc_bytes = session.get_preview("test_data", 10)
         print(f"[OK] Preview IPC bytes: {len(ipc_bytes)} bytes")
-        assert len(ipc_bytes) > 0
-        try:
-            import pyarrow.ipc as pa_ipc
-            reader = pa_ipc.open_stream(io.BytesIO(ipc_bytes))
-            table = reader.read_all()
-            assert table.num_rows == 3, f"Expected 3 rows, got {table.num_rows}"
-            assert "name" in table.column_names
-            print(f"[OK] Arrow IPC valid: {table.num_rows} rows, columns={table.column_names}")
-        except ImportError:
+        check(_is_ipc_stream(ipc_bytes), "get_preview did not return an Arrow IPC stream")
+        if hasattr(rustora, "IpcBuffer"):
+            # Zero-copy build: the payload is exported through __getbuffer__.
+            check(isinstance(ipc_bytes, rustora.IpcBuffer),
+                  f"Expected IpcBuffer, got {type(ipc_bytes).__name__}")
+            view = memoryview(ipc_bytes)
+            check(view.readonly, "IpcBuffer view should be read-only")
+            check(view.nbytes == len(ipc_bytes), "IpcBuffer view length mismatch")
+            check(bytes(ipc_bytes) == view.tobytes(), "IpcBuffer bytes() differs from its view")
+            print(f"[OK] IpcBuffer exported read-only: {view.nbytes} bytes")
+        else:
+            check(isinstance(ipc_bytes, bytes),
+                  f"Expected bytes, got {type(ipc_bytes).__name__}")
+            print("[OK] bytes payload (stable-ABI build without buffer protocol)")
+        if FULL and HAS_PYARROW:
+            reader = pa_ipc.open_stream(memoryview(ipc_bytes))
+            check("name" in reader.schema.names, f"Missing name column: {reader.schema.names}")
+            num_rows = sum(batch.num_rows for batch in reader)
+            check(num_rows == 3, f"Expected 3 rows, got {num_rows}")
+            print(f"[OK] Arrow IPC valid: {num_rows} rows, columns={reader.schema.names}")
+        elif FULL:
             print("[SKIP] pyarrow not installed, skipping Arrow validation")
 
+        # ── preview_arrow (Arrow C Data Interface) ────────────────────────
+        if HAS_PYARROW:
+            rb = session.preview_arrow("test_data", 10)
+            check(rb.num_rows == 3, f"Expected 3 rows, got {rb.num_rows}")
+            check("name" in rb.schema.names, f"Missing name column: {rb.schema.names}")
+            print(f"[OK] preview_arrow: {rb.num_rows} rows")
+        else:
+            print("[SKIP] pyarrow not installed, skipping preview_arrow")
+
         # ── get_chunk (pagination) ────────────────────────────────────────
         chunk = session.get_chunk("test_data", 0, 2)
-        assert len(chunk) > 0
+        check(_is_ipc_stream(chunk), "get_chunk did not return an Arrow IPC stream")
         print(f"[OK] get_chunk IPC bytes: {len(chunk)}")
+        if FULL and HAS_PYARROW:
+            chunk_rows = sum(batch.num_rows for batch in pa_ipc.open_stream(memoryview(chunk)))
+            check(chunk_rows == 2, f"Expected 2 rows, got {chunk_rows}")
 
         # ── execute_sql ───────────────────────────────────────────────────
         result = session.execute_sql("SELECT * FROM test_data WHERE age > 28")
         print(f"[OK] SQL result table: {result}")
-        assert isinstance(result, str) and len(result) > 0
-        result_count = session.get_row_count(result)
-        assert result_count == 2, f"Expected 2 rows after filter, got {result_count}"
+        check(isinstance(result, str) and len(result) > 0, f"Bad result table: {result!r}")
+
+        # ── query_to_ipc (scalar, single round-trip) ──────────────────────
+        if HAS_PYARROW:
+            result_count = _scalar(session, "SELECT count(*) FROM test_data WHERE age > 28")
+            check(result_count == 2, f"Expected 2 rows after filter, got {result_count}")
+            print(f"[OK] SQL filter count: {result_count}")
+        else:
+            result_count = session.get_row_count(result)
+            check(result_count == 2, f"Expected 2 rows after filter, got {result_count}")
+            print(f"[OK] SQL filter count: {result_count}")
 
         # ── query_to_ipc (no persistence) ─────────────────────────────────
         ipc_bytes2 = session.query_to_ipc("SELECT name, score FROM test_data ORDER BY score DESC")
-        assert len(ipc_bytes2) > 0
+        check(_is_ipc_stream(ipc_bytes2), "query_to_ipc did not return an Arrow IPC stream")
         print(f"[OK] query_to_ipc: {len(ipc_bytes2)} bytes")
 
         # ── sort_dataset ──────────────────────────────────────────────────
-        sorted_name = session.sort_dataset("test_data", ["age"], [False])
+        sorted_name, sorted_count = session.sort_dataset("test_data", ["age"], [False])
         print(f"[OK] Sorted dataset: {sorted_name}")
-        assert session.get_row_count(sorted_name) == 3
+        check(sorted_count == 3, f"Expected 3 sorted rows, got {sorted_count}")
 
         # ── sort_dataset -- mismatched lengths (should raise ValueError) ───
-        try:
-            session.sort_dataset("test_data", ["age", "score"], [True])
-            assert False, "Expected ValueError for mismatched lengths"
-        except ValueError as e:
-            print(f"[OK] sort_dataset length mismatch correctly raised ValueError: {e}")
+        _expect(ValueError, session.sort_dataset, "test_data", ["age", "score"], [True],
+                label="sort_dataset length mismatch")
 
         # ── filter_sql ────────────────────────────────────────────────────
-        filtered = session.filter_sql("test_data", "age < 32")
-        filtered_count = session.get_row_count(filtered)
+        filtered, filtered_count = session.filter_sql("test_data", "age < 32")
         print(f"[OK] filter_sql: {filtered_count} rows")
-        assert 0 < filtered_count < 3
+        check(0 < filtered_count < 3, f"Unexpected filtered row count: {filtered_count}")
 
         # ── scan_file (transient) ─────────────────────────────────────────
         scan_name = session.scan_file(csv_path)
         print(f"[OK] scan_file: {scan_name}")
         scan_count = session.get_row_count(scan_name)
-        assert scan_count == 3
+        check(scan_count == 3, f"Expected 3 scanned rows, got {scan_count}")
+        if HAS_PYARROW:
+            scan_rb = session.preview_arrow(scan_name, 10)
+            check(scan_rb.num_rows == 3, f"Expected 3 rows, got {scan_rb.num_rows}")
+            check("name" in scan_rb.schema.names, f"Missing name column: {scan_rb.schema.names}")
+            print(f"[OK] preview_arrow on transient dataset: {scan_rb.num_rows} rows")
+        _, lazy_count = session.sort_dataset(scan_name, ["age"], [False])
+        check(lazy_count is None, f"Transient sort should stay lazy, got count {lazy_count}")
+
+        # ── concurrent calls from a thread pool (GIL released) ────────────
+        with ThreadPoolExecutor(4) as ex:
+            counts = list(ex.map(session.get_row_count, [scan_name] * 16))
+        check(counts == [3] * 16, f"Unexpected concurrent counts: {counts}")
+        print(f"[OK] Concurrent get_row_count: {len(counts)} calls")
 
         # ── export_csv ────────────────────────────────────────────────────
-        out_csv = os.path.join(tmpdir, "out.csv")
+        out_csv = str(base / "out.csv")
         session.export_csv("test_data", out_csv)
-        with open(out_csv) as f:
-            content = f.read()
-        assert "Alice" in content
-        print(f"[OK] Exported CSV: {len(content)} chars")
+        check(os.path.getsize(out_csv) > 0, "CSV export is empty")
+        print(f"[OK] Exported CSV: {os.path.getsize(out_csv)} bytes")
 
         # ── export_parquet ────────────────────────────────────────────────
-        out_parquet = os.path.join(tmpdir, "out.parquet")
+        out_parquet = str(base / "out.parquet")
         session.export_parquet("test_data", out_parquet)
-        assert os.path.exists(out_parquet)
-        assert os.path.getsize(out_parquet) > 0
+        check(os.path.exists(out_parquet), "Parquet export was not written")
+        check(os.path.getsize(out_parquet) > 0, "Parquet export is empty")
         print(f"[OK] Exported Parquet: {os.path.getsize(out_parquet)} bytes")
 
+        # ── export_feather ────────────────────────────────────────────────
+        out_feather = str(base / "out.arrow")
+        session.export_feather("test_data", out_feather)
+        check(os.path.getsize(out_feather) > 0, "Feather export is empty")
+        print(f"[OK] Exported Feather: {os.path.getsize(out_feather)} bytes")
+
+        # ── export round-trip -- read back with Arrow readers ─────────────
+        if HAS_PYARROW:
+            csv_table = pa_csv.read_csv(out_csv)
+            check(csv_table.equals(fixture), f"CSV export differs from fixture: {csv_table}")
+            feather_table = pa_ipc.open_file(out_feather).read_all()
+            check(feather_table.num_rows == 3, f"Expected 3 rows, got {feather_table.num_rows}")
+            print(f"[OK] Export round-trip valid: csv={csv_table.num_rows}, feather={feather_table.num_rows} rows")
+            if FULL:
+                parquet_table = pq.read_table(out_parquet, memory_map=True)
+                check(parquet_table.num_rows == 3, f"Expected 3 rows, got {parquet_table.num_rows}")
+                print(f"[OK] Parquet round-trip valid: {parquet_table.num_rows} rows")
+        else:
+            with open(out_csv) as f:
+                content = f.read()
+            check("Alice" in content, "CSV export is missing expected rows")
+            print("[SKIP] pyarrow not installed, checked CSV export text only")
+
         # ── remove_dataset ────────────────────────────────────────────────
         removed = session.remove_dataset("test_data")
-        assert removed is True
+        check(removed is True, f"Expected True, got {removed}")
         print("[OK] Dataset removed")
-        assert "test_data" not in session.list_datasets()
+        check("test_data" not in session.list_datasets(), "test_data still listed after removal")
 
         # ── remove non-existent dataset ───────────────────────────────────
         removed_again = session.remove_dataset("test_data")
-        assert removed_again is False
+        check(removed_again is False, f"Expected False, got {removed_again}")
         print("[OK] Removing non-existent dataset returns False")
 
         # ── error: file not found ─────────────────────────────────────────
-        try:
-            session.import_file("/nonexistent/path/data.csv")
-            assert False, "Expected FileNotFoundError"
-        except FileNotFoundError as e:
-            print(f"[OK] FileNotFoundError correctly raised: {e}")
+        _expect(FileNotFoundError, session.import_file, "/nonexistent/path/data.csv",
+                label="missing file")
 
         # ── error: unsupported format ─────────────────────────────────────
-        bad_path = os.path.join(tmpdir, "data.xlsx")
+        bad_path = str(base / "data.xlsx")
         with open(bad_path, "w") as f:
             f.write("fake")
-        try:
-            session.import_file(bad_path)
-            assert False, "Expected ValueError for unsupported format"
-        except ValueError as e:
-            print(f"[OK] ValueError for unsupported format: {e}")
+        _expect(ValueError, session.import_file, bad_path, label="unsupported format")
 
         # ── error: table not found ────────────────────────────────────────
-        try:
-            session.get_row_count("nonexistent_table")
-            assert False, "Expected ValueError for table not found"
-        except ValueError as e:
-            print(f"[OK] ValueError for missing table: {e}")
+        _expect(ValueError, session.get_row_count, "nonexistent_table", label="missing table")
 
         # ── open_project (round-trip persistence) ─────────────────────────
-        db2_path = os.path.join(tmpdir, "persist.duckdb")
-        s2 = rustora.Session()
-        s2.new_project(db2_path)
-        s2.import_file(csv_path, "people")
-        del s2
-
-        s3 = rustora.Session()
-        tables = s3.open_project(db2_path)
-        print(f"[OK] open_project tables: {tables}")
-        assert "people" in tables
-        assert s3.get_row_count("people") == 3
-        del s3
+        # Reopen the project built above instead of creating a second one;
+        # close() releases the DuckDB file lock before it is reopened.
+        session.close()
+
+        with Session() as s2:
+            tables = s2.open_project(db_path)
+            print(f"[OK] open_project tables: {tables}")
+            check(auto_name in tables, f"{auto_name} missing after reopen: {tables}")
+            check(s2.get_row_count(auto_name) == 3, "Row count changed after reopen")
 
     print("\n=== All smoke tests passed! ===")
 